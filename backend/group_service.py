@@ -626,26 +626,28 @@ class GroupService:
     @staticmethod
     def get_group_stats(db: Session) -> schemas.GroupStatsOut:
         """Get group statistics for admin dashboard."""
-        total_groups = db.query(func.count(models.Group.id)).scalar()
-        active_groups = (
+        # One round-trip: each count is a scalar subquery of the same SELECT
+        stats = db.query(
+            db.query(func.count(models.Group.id))
+            .scalar_subquery()
+            .label("total_groups"),
             db.query(func.count(models.Group.id))
             .filter(models.Group.is_active)
-            .scalar()
-        )
-        total_members = (
+            .scalar_subquery()
+            .label("active_groups"),
             db.query(func.count(models.GroupMember.id))
             .filter(models.GroupMember.is_active)
-            .scalar()
-        )
-        pending_invitations = (
+            .scalar_subquery()
+            .label("total_members"),
             db.query(func.count(models.GroupInvitation.id))
             .filter(models.GroupInvitation.status == models.InvitationStatus.PENDING)
-            .scalar()
-        )
+            .scalar_subquery()
+            .label("pending_invitations"),
+        ).one()
 
         return schemas.GroupStatsOut(
-            total_groups=total_groups,
-            active_groups=active_groups,
-            total_members=total_members,
-            pending_invitations=pending_invitations,
+            total_groups=stats.total_groups,
+            active_groups=stats.active_groups,
+            total_members=stats.total_members,
+            pending_invitations=stats.pending_invitations,
         )
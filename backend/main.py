@@ -14,7 +14,7 @@ from authorization import (
     require_incident_access,
     require_project_access,
 )
-from config import config
+from config import Config, config
 from database import SessionLocal, engine
 from group_service import GroupService
 from lemonsqueezy_service import LemonSqueezyService
@@ -161,6 +161,11 @@ def get_db():
         db.close()
 
 
+def get_app_config() -> Config:
+    """Provide the application configuration to request handlers."""
+    return config
+
+
 @app.post("/auth/google", response_model=schemas.AuthResponse, tags=["authentication"])
 def google_auth(auth_request: schemas.GoogleAuthRequest, db: Session = Depends(get_db)):
     """
@@ -237,7 +242,7 @@ def health_check():
 
 
 @app.get("/config", response_model=schemas.ConfigResponse, tags=["configuration"])
-def get_config():
+def get_config(cfg: Config = Depends(get_app_config)):
     """
     Get application configuration and feature toggles.
 
@@ -255,11 +260,11 @@ def get_config():
     which UI components and features to display to users.
     """
     return {
-        "billing_enabled": config.is_billing_enabled(),
+        "billing_enabled": cfg.is_billing_enabled(),
         "features": {
-            "subscription_management": config.is_billing_enabled(),
-            "billing_webhooks": config.is_billing_enabled(),
-            "subscription_limits": config.is_billing_enabled(),
+            "subscription_management": cfg.is_billing_enabled(),
+            "billing_webhooks": cfg.is_billing_enabled(),
+            "subscription_limits": cfg.is_billing_enabled(),
         },
     }
 
@@ -351,6 +356,7 @@ if config.is_billing_enabled():
     def create_checkout_session(
         user: models.User = Depends(auth.get_current_user),
         db: Session = Depends(get_db),
+        cfg: Config = Depends(get_app_config),
     ):
         """
         Create Lemon Squeezy checkout URL for Pro subscription.
@@ -363,7 +369,7 @@ if config.is_billing_enabled():
         Returns a checkout URL that the client should redirect the user to.
         """
         try:
-            variant_id = config.LEMONSQUEEZY_PRO_VARIANT_ID
+            variant_id = cfg.LEMONSQUEEZY_PRO_VARIANT_ID
             if not variant_id:
                 raise HTTPException(
                     status_code=500, detail="Lemon Squeezy configuration missing"
@@ -372,7 +378,7 @@ if config.is_billing_enabled():
             checkout_url = LemonSqueezyService.create_checkout_url(
                 variant_id=variant_id,
                 customer_email=user.email,
-                success_url=(f"{config.FRONTEND_URL}/dashboard?subscription=success"),
+                success_url=(f"{cfg.FRONTEND_URL}/dashboard?subscription=success"),
                 user_id=user.id,
             )
 
@@ -465,6 +471,7 @@ def create_project(
     project: schemas.ProjectCreate,
     db: Session = Depends(get_db),
     user: models.User = Depends(auth.get_current_user),
+    cfg: Config = Depends(get_app_config),
 ):
     """
     Create a new status page project.
@@ -479,7 +486,7 @@ def create_project(
     Returns the created project information.
     """
     # Check subscription limits only if billing is enabled
-    if config.is_billing_enabled() and not LemonSqueezyService.can_create_project(
+    if cfg.is_billing_enabled() and not LemonSqueezyService.can_create_project(
         user, db
     ):
         limits = LemonSqueezyService.get_subscription_limits(user.subscription_tier)
@@ -559,6 +566,7 @@ def create_incident(
     incident: schemas.IncidentCreate,
     db: Session = Depends(get_db),
     user: models.User = Depends(auth.get_current_user),
+    cfg: Config = Depends(get_app_config),
 ):
     """
     Create a new incident for a project.
@@ -579,7 +587,7 @@ def create_incident(
     require_project_access(user, incident.project_id, "write", db)
 
     # Check subscription limits only if billing is enabled
-    if config.is_billing_enabled() and not LemonSqueezyService.can_create_incident(
+    if cfg.is_billing_enabled() and not LemonSqueezyService.can_create_incident(
         user, incident.project_id, db
     ):
         limits = LemonSqueezyService.get_subscription_limits(user.subscription_tier)
@@ -0,0 +1,44 @@
+"""
+Benchmarks for the GroupService hot paths.
+
+Skipped in normal runs; run with ``pytest tests/benchmarks --benchmark-only``
+and compare saved runs with ``--benchmark-autosave`` / ``--benchmark-compare``.
+"""
+
+import itertools
+
+import models
+import schemas
+from group_service import GroupService
+
+
+def test_create_group_bench(benchmark, db_session, owner_user_id):
+    """Benchmark creating a group with its owner membership."""
+    owner = db_session.get(models.User, owner_user_id)
+    names = (f"Bench Group {n}" for n in itertools.count())
+
+    benchmark(
+        lambda: GroupService.create_group(
+            schemas.GroupCreate(name=next(names)), owner, db_session
+        )
+    )
+
+
+def test_invite_user_bench(benchmark, db_session, owner_user_id):
+    """Benchmark inviting an email address to a group."""
+    owner = db_session.get(models.User, owner_user_id)
+    names = (f"Bench Group {n}" for n in itertools.count())
+
+    def fresh_group():
+        # Each round invites into its own group so no invitation is pending yet
+        group = GroupService.create_group(
+            schemas.GroupCreate(name=next(names)), owner, db_session
+        )
+        invitation_data = schemas.GroupInvitationCreate(
+            group_id=group.id,
+            invited_email="invitee@example.com",
+            role=models.GroupRole.MEMBER,
+        )
+        return (invitation_data, owner, db_session), {}
+
+    benchmark.pedantic(GroupService.invite_user, setup=fresh_group, rounds=100)
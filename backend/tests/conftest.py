@@ -0,0 +1,162 @@
+"""
+Shared pytest fixtures for the StatusWise backend test suite.
+
+Provides a single in-memory SQLite database whose schema is built once per
+test session and reused by every test module that requests it. Each test's
+db_session runs inside a transaction that is rolled back on teardown.
+"""
+
+import os
+import sqlite3
+
+# Set before any test module imports config, instead of in each module
+os.environ["TESTING"] = "1"
+
+import pytest
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.pool import StaticPool
+from test_helpers import TestingSessionLocal, count_queries, create_test_user
+
+import models
+
+# Each pytest-xdist worker gets its own named shared-cache in-memory database
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+SQLITE_DATABASE_URI = f"file:memdb_{XDIST_WORKER}?mode=memory&cache=shared"
+
+# Skip journaling, fsync and lock handoffs; the database never outlives the
+# test run and StaticPool only ever opens one connection to it
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY;"
+    "PRAGMA synchronous=OFF;"
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA cache_size=-64000;"
+    "PRAGMA locking_mode=EXCLUSIVE;"
+)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--runslow", action="store_true", default=False, help="run tests marked slow"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip tests marked slow unless --runslow is given"""
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="need --runslow option to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """Create the shared test engine once for the entire test session"""
+    # isolation_level=None stops sqlite3 from opening transactions implicitly,
+    # so the SAVEPOINTs issued by db_session behave as expected
+    connection = sqlite3.connect(
+        SQLITE_DATABASE_URI, uri=True, check_same_thread=False, isolation_level=None
+    )
+    connection.executescript(SQLITE_PRAGMAS)
+
+    # StaticPool hands out this one connection for every checkout
+    engine = create_engine(
+        "sqlite://", creator=lambda: connection, poolclass=StaticPool
+    )
+
+    # sqlite3 no longer emits BEGIN for us, so every connection checked out of
+    # the engine opens its transactions explicitly
+    @event.listens_for(engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    TestingSessionLocal.configure(bind=engine)
+    yield engine
+    engine.dispose()
+    connection.close()
+
+
+@pytest.fixture(scope="session")
+def tables(engine):
+    """Create tables once for the entire test session"""
+    models.Base.metadata.create_all(bind=engine)
+    yield
+    models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db_session(engine, tables):
+    """Create a database session whose changes are rolled back after the test"""
+    connection = engine.connect()
+    transaction = connection.begin()
+
+    # Commits inside the code under test only release a SAVEPOINT
+    db = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield db
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def query_count(db_session):
+    """
+    Count the statements db_session executes inside a block.
+
+    Use as ``with query_count() as queries:`` and assert on ``len(queries)``.
+    """
+    return lambda: count_queries(db_session)
+
+
+@pytest.fixture(scope="module")
+def owner_user_id(tables):
+    """
+    Commit one owner@example.com user for a test module and yield its ID.
+
+    The row lives outside any db_session transaction, so tests must not
+    modify it; it is deleted once the module finishes.
+    """
+    with TestingSessionLocal() as db:
+        owner = create_test_user(email="owner@example.com")
+        db.add(owner)
+        db.commit()
+        owner_id = owner.id
+
+    yield owner_id
+
+    with TestingSessionLocal() as db:
+        db.execute(delete(models.User).where(models.User.id == owner_id))
+        db.commit()
+
+
+@pytest.fixture(scope="module")
+def seeded_owner_and_group(owner_user_id):
+    """
+    Commit a group owned by the module's owner, with the owner membership.
+
+    Yields ``(owner_id, group_id)``. Like owner_user_id the rows are
+    read-only for tests and deleted once the module finishes.
+    """
+    with TestingSessionLocal() as db:
+        group = models.Group(name="Seeded Group", owner_id=owner_user_id)
+        db.add(group)
+        db.flush()
+        db.add(
+            models.GroupMember(
+                group_id=group.id, user_id=owner_user_id, role=models.GroupRole.OWNER
+            )
+        )
+        db.commit()
+        group_id = group.id
+
+    yield owner_user_id, group_id
+
+    with TestingSessionLocal() as db:
+        db.execute(
+            delete(models.GroupMember).where(models.GroupMember.group_id == group_id)
+        )
+        db.execute(delete(models.Group).where(models.Group.id == group_id))
+        db.commit()
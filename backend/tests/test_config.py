@@ -1,9 +1,12 @@
 import os
+from importlib import reload
 from unittest.mock import patch
 
 # Set testing environment variable before importing main
 os.environ["TESTING"] = "1"
 
+import config as config_module
+
 
 class TestConfig:
     """Test the configuration module and feature toggles."""
@@ -12,10 +15,6 @@ class TestConfig:
         """Test that default values are set correctly."""
         with patch.dict(os.environ, {}, clear=True):
             # Need to reimport to get fresh values
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             # Feature toggles should default to False
@@ -34,10 +33,6 @@ class TestConfig:
                 os.environ,
                 {"ENABLE_BILLING": value, "LEMONSQUEEZY_API_KEY": "test_key"},
             ):
-                from importlib import reload
-
-                import config as config_module
-
                 reload(config_module)
 
                 assert (
@@ -53,10 +48,6 @@ class TestConfig:
 
         for value in false_values:
             with patch.dict(os.environ, {"ENABLE_BILLING": value}):
-                from importlib import reload
-
-                import config as config_module
-
                 reload(config_module)
 
                 assert (
@@ -70,10 +61,6 @@ class TestConfig:
         """Test that billing is only enabled when API key is present."""
         # Billing flag true but no API key
         with patch.dict(os.environ, {"ENABLE_BILLING": "true"}, clear=True):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             assert config_module.Config.ENABLE_BILLING is True
@@ -85,10 +72,6 @@ class TestConfig:
             {"ENABLE_BILLING": "true", "LEMONSQUEEZY_API_KEY": "test_key"},
             clear=True,
         ):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             assert config_module.Config.ENABLE_BILLING is True
@@ -100,10 +83,6 @@ class TestConfig:
             {"ENABLE_BILLING": "false", "LEMONSQUEEZY_API_KEY": "test_key"},
             clear=True,
         ):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             assert config_module.Config.ENABLE_BILLING is False
@@ -113,10 +92,6 @@ class TestConfig:
         """Test getting billing configuration."""
         # When billing is disabled
         with patch.dict(os.environ, {"ENABLE_BILLING": "false"}, clear=True):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             billing_config = config_module.Config.get_billing_config()
@@ -134,10 +109,6 @@ class TestConfig:
             },
             clear=True,
         ):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             billing_config = config_module.Config.get_billing_config()
@@ -154,10 +125,6 @@ class TestConfig:
         """Test configuration validation for billing when enabled but missing keys."""
         # Billing enabled but missing API key
         with patch.dict(os.environ, {"ENABLE_BILLING": "true"}, clear=True):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             errors = config_module.Config.validate_configuration()
@@ -170,10 +137,6 @@ class TestConfig:
             {"ENABLE_BILLING": "true", "LEMONSQUEEZY_API_KEY": "test_key"},
             clear=True,
         ):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             errors = config_module.Config.validate_configuration()
@@ -192,10 +155,6 @@ class TestConfig:
             },
             clear=True,
         ):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             errors = config_module.Config.validate_configuration()
@@ -212,10 +171,6 @@ class TestConfig:
             },
             clear=True,
         ):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             errors = config_module.Config.validate_configuration()
@@ -233,10 +188,6 @@ class TestConfig:
             },
             clear=True,
         ):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             errors = config_module.Config.validate_configuration()
@@ -259,10 +210,6 @@ class TestConfig:
                 "LEMONSQUEEZY_PRO_VARIANT_ID": "test_variant",
             },
         ):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             assert config_module.Config.DATABASE_URL == "test://db"
@@ -277,19 +224,11 @@ class TestConfig:
     def test_testing_flag(self):
         """Test that testing flag works correctly."""
         with patch.dict(os.environ, {"TESTING": "true"}):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             assert config_module.Config.TESTING is True
 
         with patch.dict(os.environ, {"TESTING": "false"}):
-            from importlib import reload
-
-            import config as config_module
-
             reload(config_module)
 
             assert config_module.Config.TESTING is False
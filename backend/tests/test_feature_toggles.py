@@ -1,116 +1,118 @@
 import os
-from unittest.mock import patch
+from dataclasses import dataclass
 
 # Set testing environment variable before importing main
 os.environ["TESTING"] = "1"
 
 import pytest
+from fastapi import Depends
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from test_helpers import create_test_user
+from test_helpers import TestingSessionLocal
 
+import auth
 from auth import create_access_token
-from database import Base, override_engine
+from database import Base
+from main import app, get_app_config, get_db
 from models import User
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-override_engine(engine)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Create tables once at module level
-Base.metadata.create_all(bind=engine)
-
 
 def override_get_db():
-    try:
-        db = TestingSessionLocal()
+    with TestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-class TestFeatureToggles:
-    """Test feature toggle functionality."""
+def override_auth_get_db(db=Depends(get_db)):
+    """Reuse the request's session; StaticPool allows one transaction at a time"""
+    return db
 
-    def setup_method(self):
-        """Set up test database for each test."""
-        # Clear any existing data
-        db = TestingSessionLocal()
-        db.query(User).delete()
-        db.commit()
-        db.close()
 
-    @patch("main.config")
-    def test_config_endpoint_billing_disabled(self, mock_config):
-        """Test config endpoint when billing is disabled."""
-        # Mock the config
-        mock_config.is_billing_enabled.return_value = False
+# The token payload never changes, so sign it once for the whole module
+TEST_EMAIL = "test@example.com"
+TEST_TOKEN = create_access_token({"sub": TEST_EMAIL})
+TEST_HEADERS = {"Authorization": f"Bearer {TEST_TOKEN}"}
 
-        # Import and set up the app after mocking
-        from main import app, get_db
 
-        app.dependency_overrides[get_db] = override_get_db
-        client = TestClient(app)
+def _wipe(engine):
+    """Clear every table in a single transaction"""
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
 
-        response = client.get("/config")
-        assert response.status_code == 200
 
-        data = response.json()
-        assert data["billing_enabled"] is False
-        assert data["features"]["subscription_management"] is False
+def _add_user(engine, email, **values):
+    """Insert a Google OAuth user with a Core INSERT, bypassing the ORM"""
+    with engine.begin() as conn:
+        conn.execute(
+            User.__table__.insert().values(
+                email=email, google_id=f"google_{email}", **values
+            )
+        )
+
+
+@dataclass(frozen=True)
+class FakeConfig:
+    """Stand-in for config.Config exposing only the feature toggles"""
+
+    billing: bool = False
 
-    @patch("main.config")
-    def test_config_endpoint_features_enabled(self, mock_config):
-        """Test config endpoint when features are enabled."""
-        # Mock the config
-        mock_config.is_billing_enabled.return_value = True
+    def is_billing_enabled(self) -> bool:
+        return self.billing
 
-        # Import and set up the app after mocking
-        from main import app, get_db
 
-        app.dependency_overrides[get_db] = override_get_db
-        client = TestClient(app)
+@pytest.fixture
+def cfg(monkeypatch):
+    """Install a FakeConfig override for the current test"""
+
+    def install(**values):
+        config = FakeConfig(**values)
+        monkeypatch.setitem(app.dependency_overrides, get_app_config, lambda: config)
+
+    return install
+
+
+@pytest.fixture(scope="module")
+def client(tables):
+    """Share one TestClient across every test in this module"""
+    return TestClient(app)
+
+
+class TestFeatureToggles:
+    """Test feature toggle functionality."""
+
+    @pytest.fixture(autouse=True)
+    def override_db(self, monkeypatch):
+        """Point both the app and auth at the shared test database."""
+        monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+        monkeypatch.setitem(app.dependency_overrides, auth.get_db, override_auth_get_db)
+
+    @pytest.fixture(autouse=True)
+    def clean_database(self, engine):
+        """Wipe committed rows after each test so other modules start clean."""
+        yield
+        _wipe(engine)
+
+    @pytest.mark.parametrize(
+        "billing", [False, True], ids=["billing_disabled", "billing_enabled"]
+    )
+    def test_config_endpoint(self, client, cfg, billing):
+        """Test config endpoint reflects the billing toggle."""
+        cfg(billing=billing)
 
         response = client.get("/config")
         assert response.status_code == 200
 
         data = response.json()
-        assert data["billing_enabled"] is True
-        assert data["features"]["subscription_management"] is True
+        assert data["billing_enabled"] is billing
+        assert data["features"]["subscription_management"] is billing
 
-    @patch("main.config")
-    def test_subscription_status_billing_disabled(self, mock_config):
+    def test_subscription_status_billing_disabled(self, client, cfg, engine):
         """Test subscription status when billing is disabled."""
-        # Mock the config
-        mock_config.is_billing_enabled.return_value = False
-
-        # Import and set up the app after mocking
-        from main import app, get_db
-
-        app.dependency_overrides[get_db] = override_get_db
-        client = TestClient(app)
+        cfg(billing=False)
 
         # Create a test user with Google OAuth
-        db = TestingSessionLocal()
-        test_user = create_test_user(email="test@example.com")
-        db.add(test_user)
-        db.commit()
-        db.refresh(test_user)
+        _add_user(engine, TEST_EMAIL)
 
-        # Create JWT token directly instead of using login endpoint
-        token = create_access_token({"sub": test_user.email})
-
-        response = client.get(
-            "/subscription/status", headers={"Authorization": f"Bearer {token}"}
-        )
+        response = client.get("/subscription/status", headers=TEST_HEADERS)
         assert response.status_code == 200
 
         data = response.json()
@@ -121,101 +123,48 @@ class TestFeatureToggles:
         assert data["limits"]["max_projects"] == 999999
         assert data["usage"]["max_projects"] == 999999
 
-        db.close()
-
-    @patch("main.config")
-    def test_subscription_checkout_billing_disabled(self, mock_config):
+    def test_subscription_checkout_billing_disabled(self, client, cfg, engine):
         """Test subscription checkout when billing is disabled."""
-        # Mock the config
-        mock_config.is_billing_enabled.return_value = False
-
-        # Import and set up the app after mocking
-        from main import app, get_db
-
-        app.dependency_overrides[get_db] = override_get_db
-        client = TestClient(app)
+        cfg(billing=False)
 
         # Create a test user with Google OAuth
-        db = TestingSessionLocal()
-        test_user = create_test_user(email="test@example.com")
-        db.add(test_user)
-        db.commit()
-        db.refresh(test_user)
-
-        # Create JWT token directly
-        token = create_access_token({"sub": test_user.email})
+        _add_user(engine, TEST_EMAIL)
 
         response = client.post(
             "/subscription/create-checkout",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=TEST_HEADERS,
         )
         assert response.status_code == 503
         assert "Billing functionality is disabled" in response.json()["detail"]
 
-        db.close()
-
-    @patch("main.config")
-    def test_webhook_billing_disabled(self, mock_config):
+    def test_webhook_billing_disabled(self, client, cfg):
         """Test webhook endpoint when billing is disabled."""
-        # Mock the config
-        mock_config.is_billing_enabled.return_value = False
-
-        # Import and set up the app after mocking
-        from main import app, get_db
-
-        app.dependency_overrides[get_db] = override_get_db
-        client = TestClient(app)
+        cfg(billing=False)
 
         response = client.post("/webhooks/lemonsqueezy", json={"test": "data"})
         assert response.status_code == 503
         assert "Billing webhooks are disabled" in response.json()["detail"]
 
-    @patch("main.config")
-    def test_core_functionality_still_works(self, mock_config):
+    @pytest.mark.parametrize(
+        "method,path,body",
+        [
+            ("get", "/health", None),
+            ("get", "/", None),
+            ("get", "/projects/", None),
+            ("post", "/projects/", {"name": "Test Project"}),
+        ],
+        ids=["health", "root", "list_projects", "create_project"],
+    )
+    def test_core_endpoint_ok(self, client, cfg, engine, method, path, body):
         """Test that core functionality still works when features are disabled."""
-        # Mock the config
-        mock_config.is_billing_enabled.return_value = False
-
-        # Import and set up the app after mocking
-        from main import app, get_db
-
-        app.dependency_overrides[get_db] = override_get_db
-        client = TestClient(app)
+        cfg(billing=False)
 
         # Create a test user with Google OAuth
-        db = TestingSessionLocal()
-        test_user = create_test_user(email="test@example.com")
-        db.add(test_user)
-        db.commit()
-        db.refresh(test_user)
+        _add_user(engine, TEST_EMAIL)
 
-        # Create JWT token directly
-        token = create_access_token({"sub": test_user.email})
-
-        # Health check should still work
-        response = client.get("/health")
-        assert response.status_code == 200
-
-        # Root endpoint should still work
-        response = client.get("/")
-        assert response.status_code == 200
-
-        # Projects should still work
-        response = client.get(
-            "/projects/", headers={"Authorization": f"Bearer {token}"}
-        )
+        response = client.request(method, path, json=body, headers=TEST_HEADERS)
         assert response.status_code == 200
 
-        # Can create projects without limits
-        response = client.post(
-            "/projects/",
-            json={"name": "Test Project"},
-            headers={"Authorization": f"Bearer {token}"},
-        )
-        assert response.status_code == 200
-
-        db.close()
-
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
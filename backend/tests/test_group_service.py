@@ -3,490 +3,357 @@ Unit tests for GroupService functionality.
 """
 
 import datetime
-import os
-
-# Set testing environment variable before importing
-os.environ["TESTING"] = "1"
+from contextlib import nullcontext
 
 import pytest
 from fastapi import HTTPException
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from test_helpers import create_test_user
+from sqlalchemy import select
+from test_helpers import create_test_user, no_lazy_loads, seed_users_bulk
 
 import models
 import schemas
-from database import Base, override_engine
 from group_service import GroupService
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-override_engine(engine)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Create tables once at module level
-Base.metadata.create_all(bind=engine)
-
-
-@pytest.fixture(scope="session", autouse=True)
-def setup_database():
-    """Create tables once for the entire test session"""
-    Base.metadata.create_all(bind=engine)
-    yield
-    Base.metadata.drop_all(bind=engine)
-
-
-@pytest.fixture(autouse=True)
-def clean_database():
-    """Clean all data before each test"""
-    db = TestingSessionLocal()
-    try:
-        # Delete all data in reverse dependency order
-        db.query(models.GroupInvitation).delete()
-        db.query(models.GroupMember).delete()
-        db.query(models.Group).delete()
-        db.query(models.Incident).delete()
-        db.query(models.Project).delete()
-        db.query(models.User).delete()
-        db.commit()
-    finally:
-        db.close()
-    yield
+# Fixed expiry timestamps keep the checks deterministic: GroupService compares
+# against the real clock, so one can never lapse and one has always lapsed
+FAR_FUTURE = datetime.datetime(9999, 1, 1, tzinfo=datetime.timezone.utc)
+PAST = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+# GroupService only reads its input schemas, so these instances are shared
+_DEFAULT_GROUP_DATA = schemas.GroupCreate(name="Test Group")
+_ADMIN_ROLE_UPDATE = schemas.GroupMemberUpdate(role=models.GroupRole.ADMIN)
+
+
+@pytest.fixture
+def invitation_ctx(db_session, owner_user_id):
+    """Owner, invitee and the owner's group for the invitation response tests."""
+    owner = db_session.get(models.User, owner_user_id)
+    invitee = create_test_user(email="invitee@example.com", google_id="invitee_123")
+    db_session.add(invitee)
+    db_session.flush()
+    group = GroupService.create_group(_DEFAULT_GROUP_DATA, owner, db_session)
+    return owner, invitee, group
 
 
 class TestGroupService:
     """Test cases for GroupService operations."""
 
-    def test_create_group_success(self):
+    def test_create_group_success(self, db_session, owner_user_id, query_count):
         """Test successful group creation."""
-        db = TestingSessionLocal()
-        try:
-            user = create_test_user(email="owner@example.com")
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-
-            group_data = schemas.GroupCreate(
-                name="Test Group", description="A test group"
-            )
+        user = db_session.get(models.User, owner_user_id)
+
+        group_data = schemas.GroupCreate(name="Test Group", description="A test group")
 
-            group = GroupService.create_group(group_data, user, db)
+        with query_count() as queries:
+            group = GroupService.create_group(group_data, user, db_session)
 
-            assert group.name == "Test Group"
-            assert group.description == "A test group"
-            assert group.owner_id == user.id
-            assert group.is_active is True
+        # Duplicate-name check, group and membership inserts, refresh
+        assert len(queries) <= 4
 
-            # Check that owner is automatically added as a member
-            membership = (
-                db.query(models.GroupMember)
-                .filter_by(group_id=group.id, user_id=user.id)
-                .first()
+        assert group.name == "Test Group"
+        assert group.description == "A test group"
+        assert group.owner_id == user.id
+        assert group.is_active is True
+
+        # Check that owner is automatically added as a member
+        membership = db_session.scalar(
+            select(models.GroupMember).where(
+                models.GroupMember.group_id == group.id,
+                models.GroupMember.user_id == user.id,
             )
-            assert membership is not None
-            assert membership.role == models.GroupRole.OWNER
-        finally:
-            db.close()
+        )
+        assert membership is not None
+        assert membership.role == models.GroupRole.OWNER
 
-    def test_create_group_duplicate_name(self):
+    def test_create_group_duplicate_name(self, db_session, owner_user_id):
         """Test creating group with duplicate name fails."""
-        db = TestingSessionLocal()
-        try:
-            user = create_test_user(email="owner@example.com")
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+        user = db_session.get(models.User, owner_user_id)
 
-            # Create first group
-            group_data = schemas.GroupCreate(name="Test Group")
-            GroupService.create_group(group_data, user, db)
+        # Create first group
+        GroupService.create_group(_DEFAULT_GROUP_DATA, user, db_session)
 
-            # Try to create second group with same name
-            with pytest.raises(HTTPException) as exc_info:
-                GroupService.create_group(group_data, user, db)
+        # Try to create second group with same name
+        with pytest.raises(HTTPException) as exc_info:
+            GroupService.create_group(_DEFAULT_GROUP_DATA, user, db_session)
 
-            assert exc_info.value.status_code == 400
-            assert "already exists" in str(exc_info.value.detail)
-        finally:
-            db.close()
+        assert exc_info.value.status_code == 400
+        assert "already exists" in exc_info.value.detail
 
-    def test_get_user_groups(self):
+    def test_get_user_groups(self, db_session, seeded_owner_and_group, query_count):
         """Test getting user's groups."""
-        db = TestingSessionLocal()
-        try:
-            owner = create_test_user(email="owner@example.com")
-            member = create_test_user(
-                email="member@example.com", google_id="member_123"
-            )
-            db.add_all([owner, member])
-            db.commit()
-            db.refresh(owner)
-            db.refresh(member)
-
-            # Create group
-            group_data = schemas.GroupCreate(name="Test Group")
-            group = GroupService.create_group(group_data, owner, db)
-
-            # Add member
-            membership = models.GroupMember(
-                group_id=group.id, user_id=member.id, role=models.GroupRole.MEMBER
-            )
-            db.add(membership)
-            db.commit()
-
-            # Get groups for member
-            groups = GroupService.get_user_groups(member, db)
-
-            assert len(groups) == 1
-            assert groups[0].id == group.id
-            assert groups[0].user_role == models.GroupRole.MEMBER
-        finally:
-            db.close()
-
-    def test_invite_user_success(self):
+        _, group_id = seeded_owner_and_group
+        group = db_session.get(models.Group, group_id)
+        member = create_test_user(email="member@example.com", google_id="member_123")
+        db_session.add(member)
+        db_session.flush()
+
+        # Add member
+        membership = models.GroupMember(
+            group_id=group.id, user_id=member.id, role=models.GroupRole.MEMBER
+        )
+        db_session.add(membership)
+        db_session.flush()
+
+        # Get groups for member without a query per group
+        with query_count() as queries, no_lazy_loads(db_session):
+            groups = GroupService.get_user_groups(member, db_session)
+
+        assert len(queries) <= 2
+
+        assert len(groups) == 1
+        assert groups[0].id == group.id
+        assert groups[0].user_role == models.GroupRole.MEMBER
+
+    def test_invite_user_success(self, db_session, seeded_owner_and_group, query_count):
         """Test successful user invitation."""
-        db = TestingSessionLocal()
-        try:
-            owner = create_test_user(email="owner@example.com")
-            db.add(owner)
-            db.commit()
-            db.refresh(owner)
-
-            # Create group
-            group_data = schemas.GroupCreate(name="Test Group")
-            group = GroupService.create_group(group_data, owner, db)
-
-            # Send invitation
-            invitation_data = schemas.GroupInvitationCreate(
-                group_id=group.id,
-                invited_email="invitee@example.com",
-                role=models.GroupRole.MEMBER,
-                message="Join our group!",
-            )
-
-            invitation = GroupService.invite_user(invitation_data, owner, db)
-
-            assert invitation.group_id == group.id
-            assert invitation.invited_email == "invitee@example.com"
-            assert invitation.role == models.GroupRole.MEMBER
-            assert invitation.message == "Join our group!"
-            assert invitation.status == models.InvitationStatus.PENDING
-            assert invitation.expires_at is not None
-        finally:
-            db.close()
-
-    def test_invite_user_insufficient_permissions(self):
-        """Test invitation fails without proper permissions."""
-        db = TestingSessionLocal()
-        try:
-            owner = create_test_user(email="owner@example.com")
-            member = create_test_user(
-                email="member@example.com", google_id="member_123"
-            )
-            db.add_all([owner, member])
-            db.commit()
-            db.refresh(owner)
-            db.refresh(member)
-
-            # Create group
-            group_data = schemas.GroupCreate(name="Test Group")
-            group = GroupService.create_group(group_data, owner, db)
-
-            # Add member without admin rights
-            membership = models.GroupMember(
-                group_id=group.id, user_id=member.id, role=models.GroupRole.MEMBER
-            )
-            db.add(membership)
-            db.commit()
-
-            # Try to send invitation as regular member
-            invitation_data = schemas.GroupInvitationCreate(
-                group_id=group.id,
-                invited_email="invitee@example.com",
-                role=models.GroupRole.MEMBER,
-            )
-
-            with pytest.raises(HTTPException) as exc_info:
-                GroupService.invite_user(invitation_data, member, db)
-
-            assert exc_info.value.status_code == 403
-            assert "Insufficient permissions" in str(exc_info.value.detail)
-        finally:
-            db.close()
-
-    def test_invite_existing_member_fails(self):
+        owner_id, group_id = seeded_owner_and_group
+        owner = db_session.get(models.User, owner_id)
+        group = db_session.get(models.Group, group_id)
+
+        # Send invitation
+        invitation_data = schemas.GroupInvitationCreate(
+            group_id=group.id,
+            invited_email="invitee@example.com",
+            role=models.GroupRole.MEMBER,
+            message="Join our group!",
+        )
+
+        with query_count() as queries:
+            invitation = GroupService.invite_user(invitation_data, owner, db_session)
+
+        # Permission, group, invitee and pending-invitation lookups, the insert
+        # and the refresh of the new invitation
+        assert len(queries) <= 6
+
+        assert invitation.group_id == group.id
+        assert invitation.invited_email == "invitee@example.com"
+        assert invitation.role == models.GroupRole.MEMBER
+        assert invitation.message == "Join our group!"
+        assert invitation.status == models.InvitationStatus.PENDING
+        assert invitation.expires_at is not None
+
+    @pytest.mark.parametrize(
+        "service_call,expected_substring",
+        [
+            (
+                lambda group, member, membership, db: GroupService.invite_user(
+                    schemas.GroupInvitationCreate(
+                        group_id=group.id,
+                        invited_email="invitee@example.com",
+                        role=models.GroupRole.MEMBER,
+                    ),
+                    member,
+                    db,
+                ),
+                "Insufficient permissions",
+            ),
+            (
+                lambda group, member, membership, db: GroupService.update_member_role(
+                    group.id,
+                    membership.id,
+                    _ADMIN_ROLE_UPDATE,
+                    member,
+                    db,
+                ),
+                "Insufficient permissions",
+            ),
+            (
+                lambda group, member, membership, db: GroupService.delete_group(
+                    group.id, member, db
+                ),
+                "Only group owners",
+            ),
+        ],
+        ids=["invite_user", "update_member_role", "delete_group"],
+    )
+    def test_member_insufficient_permissions(
+        self, db_session, seeded_owner_and_group, service_call, expected_substring
+    ):
+        """Test privileged group operations fail for a regular member."""
+        _, group_id = seeded_owner_and_group
+        group = db_session.get(models.Group, group_id)
+        member = create_test_user(email="member@example.com", google_id="member_123")
+        db_session.add(member)
+        db_session.flush()
+
+        # Add member without admin rights
+        membership = models.GroupMember(
+            group_id=group.id, user_id=member.id, role=models.GroupRole.MEMBER
+        )
+        db_session.add(membership)
+        db_session.flush()
+
+        # Try the operation as regular member
+        with pytest.raises(HTTPException) as exc_info:
+            service_call(group, member, membership, db_session)
+
+        assert exc_info.value.status_code == 403
+        assert expected_substring in exc_info.value.detail
+
+    def test_invite_existing_member_fails(self, db_session, seeded_owner_and_group):
         """Test that inviting existing member fails."""
-        db = TestingSessionLocal()
-        try:
-            owner = create_test_user(email="owner@example.com")
-            member = create_test_user(
-                email="member@example.com", google_id="member_123"
-            )
-            db.add_all([owner, member])
-            db.commit()
-            db.refresh(owner)
-            db.refresh(member)
-
-            # Create group
-            group_data = schemas.GroupCreate(name="Test Group")
-            group = GroupService.create_group(group_data, owner, db)
-
-            # Add member
-            membership = models.GroupMember(
-                group_id=group.id, user_id=member.id, role=models.GroupRole.MEMBER
-            )
-            db.add(membership)
-            db.commit()
-
-            # Try to invite existing member
-            invitation_data = schemas.GroupInvitationCreate(
-                group_id=group.id,
-                invited_user_id=member.id,
-                role=models.GroupRole.MEMBER,
-            )
-
-            with pytest.raises(HTTPException) as exc_info:
-                GroupService.invite_user(invitation_data, owner, db)
-
-            assert exc_info.value.status_code == 400
-            assert "already a member" in str(exc_info.value.detail)
-        finally:
-            db.close()
-
-    def test_respond_to_invitation_accept(self):
-        """Test accepting an invitation."""
-        db = TestingSessionLocal()
-        try:
-            owner = create_test_user(email="owner@example.com")
-            invitee = create_test_user(
-                email="invitee@example.com", google_id="invitee_123"
-            )
-            db.add_all([owner, invitee])
-            db.commit()
-            db.refresh(owner)
-            db.refresh(invitee)
-
-            # Create group
-            group_data = schemas.GroupCreate(name="Test Group")
-            group = GroupService.create_group(group_data, owner, db)
-
-            # Create invitation
-            invitation = models.GroupInvitation(
-                group_id=group.id,
-                invited_user_id=invitee.id,
-                invited_email=invitee.email,
-                invited_by_id=owner.id,
-                role=models.GroupRole.MEMBER,
-                expires_at=datetime.datetime.now(datetime.timezone.utc)
-                + datetime.timedelta(days=7),
-            )
-            db.add(invitation)
-            db.commit()
-            db.refresh(invitation)
-
-            # Accept invitation
-            response_data = schemas.GroupInvitationUpdate(
-                status=models.InvitationStatus.ACCEPTED
-            )
-
+        owner_id, group_id = seeded_owner_and_group
+        owner = db_session.get(models.User, owner_id)
+        group = db_session.get(models.Group, group_id)
+        member = create_test_user(email="member@example.com", google_id="member_123")
+        db_session.add(member)
+        db_session.flush()
+
+        # Add member
+        membership = models.GroupMember(
+            group_id=group.id, user_id=member.id, role=models.GroupRole.MEMBER
+        )
+        db_session.add(membership)
+        db_session.flush()
+
+        # Try to invite existing member
+        invitation_data = schemas.GroupInvitationCreate(
+            group_id=group.id,
+            invited_user_id=member.id,
+            role=models.GroupRole.MEMBER,
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            GroupService.invite_user(invitation_data, owner, db_session)
+
+        assert exc_info.value.status_code == 400
+        assert "already a member" in exc_info.value.detail
+
+    @pytest.mark.parametrize(
+        "expires_at,response_status,expect_exc,expect_membership",
+        [
+            pytest.param(
+                FAR_FUTURE,
+                models.InvitationStatus.ACCEPTED,
+                None,
+                True,
+                id="accept",
+            ),
+            pytest.param(
+                FAR_FUTURE,
+                models.InvitationStatus.DECLINED,
+                None,
+                False,
+                id="decline",
+            ),
+            pytest.param(
+                PAST,
+                models.InvitationStatus.ACCEPTED,
+                HTTPException,
+                False,
+                id="expired",
+            ),
+        ],
+    )
+    def test_respond_to_invitation(
+        self,
+        db_session,
+        invitation_ctx,
+        expires_at,
+        response_status,
+        expect_exc,
+        expect_membership,
+    ):
+        """Test accepting, declining and responding to an expired invitation."""
+        owner, invitee, group = invitation_ctx
+
+        # Create invitation, already expired in the PAST case
+        invitation = models.GroupInvitation(
+            group_id=group.id,
+            invited_user_id=invitee.id,
+            invited_email=invitee.email,
+            invited_by_id=owner.id,
+            role=models.GroupRole.MEMBER,
+            expires_at=expires_at,
+        )
+        db_session.add(invitation)
+        db_session.flush()
+
+        # Respond to invitation
+        response_data = schemas.GroupInvitationUpdate(status=response_status)
+        expectation = pytest.raises(expect_exc) if expect_exc else nullcontext()
+
+        with expectation as exc_info:
             updated_invitation = GroupService.respond_to_invitation(
-                invitation.id, response_data, invitee, db
+                invitation.id, response_data, invitee, db_session
             )
 
-            assert updated_invitation.status == models.InvitationStatus.ACCEPTED
+        if expect_exc:
+            assert exc_info.value.status_code == 400
+            assert "expired" in exc_info.value.detail
+        else:
+            assert updated_invitation.status == response_status
             assert updated_invitation.responded_at is not None
 
-            # Check membership was created
-            membership = (
-                db.query(models.GroupMember)
-                .filter_by(group_id=group.id, user_id=invitee.id)
-                .first()
-            )
+        # Check membership was created only for an accepted invitation
+        membership_query = select(models.GroupMember).where(
+            models.GroupMember.group_id == group.id,
+            models.GroupMember.user_id == invitee.id,
+        )
+        if expect_membership:
+            membership = db_session.scalar(membership_query)
             assert membership is not None
             assert membership.role == models.GroupRole.MEMBER
-        finally:
-            db.close()
-
-    def test_respond_to_invitation_decline(self):
-        """Test declining an invitation."""
-        db = TestingSessionLocal()
-        try:
-            owner = create_test_user(email="owner@example.com")
-            invitee = create_test_user(
-                email="invitee@example.com", google_id="invitee_123"
-            )
-            db.add_all([owner, invitee])
-            db.commit()
-            db.refresh(owner)
-            db.refresh(invitee)
-
-            # Create group
-            group_data = schemas.GroupCreate(name="Test Group")
-            group = GroupService.create_group(group_data, owner, db)
-
-            # Create invitation
-            invitation = models.GroupInvitation(
-                group_id=group.id,
-                invited_user_id=invitee.id,
-                invited_email=invitee.email,
-                invited_by_id=owner.id,
-                role=models.GroupRole.MEMBER,
-                expires_at=datetime.datetime.now(datetime.timezone.utc)
-                + datetime.timedelta(days=7),
-            )
-            db.add(invitation)
-            db.commit()
-            db.refresh(invitation)
-
-            # Decline invitation
-            response_data = schemas.GroupInvitationUpdate(
-                status=models.InvitationStatus.DECLINED
-            )
-
-            updated_invitation = GroupService.respond_to_invitation(
-                invitation.id, response_data, invitee, db
-            )
-
-            assert updated_invitation.status == models.InvitationStatus.DECLINED
-            assert updated_invitation.responded_at is not None
+        else:
+            assert not db_session.scalar(select(membership_query.exists()))
 
-            # Check no membership was created
-            membership = (
-                db.query(models.GroupMember)
-                .filter_by(group_id=group.id, user_id=invitee.id)
-                .first()
-            )
-            assert membership is None
-        finally:
-            db.close()
-
-    def test_respond_to_expired_invitation_fails(self):
-        """Test that responding to expired invitation fails."""
-        db = TestingSessionLocal()
-        try:
-            owner = create_test_user(email="owner@example.com")
-            invitee = create_test_user(
-                email="invitee@example.com", google_id="invitee_123"
-            )
-            db.add_all([owner, invitee])
-            db.commit()
-            db.refresh(owner)
-            db.refresh(invitee)
-
-            # Create group
-            group_data = schemas.GroupCreate(name="Test Group")
-            group = GroupService.create_group(group_data, owner, db)
-
-            # Create expired invitation
-            invitation = models.GroupInvitation(
-                group_id=group.id,
-                invited_user_id=invitee.id,
-                invited_email=invitee.email,
-                invited_by_id=owner.id,
-                role=models.GroupRole.MEMBER,
-                expires_at=datetime.datetime.now(datetime.timezone.utc)
-                - datetime.timedelta(days=1),
-            )
-            db.add(invitation)
-            db.commit()
-            db.refresh(invitation)
-
-            # Try to accept expired invitation
-            response_data = schemas.GroupInvitationUpdate(
-                status=models.InvitationStatus.ACCEPTED
-            )
+    def test_update_member_role_success(self, db_session, owner_user_id):
+        """Test successful member role update."""
+        owner = db_session.get(models.User, owner_user_id)
+        member = create_test_user(email="member@example.com", google_id="member_123")
+        db_session.add(member)
+        db_session.flush()
 
-            with pytest.raises(HTTPException) as exc_info:
-                GroupService.respond_to_invitation(
-                    invitation.id, response_data, invitee, db
-                )
+        # Create group
+        group = GroupService.create_group(_DEFAULT_GROUP_DATA, owner, db_session)
 
-            assert exc_info.value.status_code == 400
-            assert "expired" in str(exc_info.value.detail)
-        finally:
-            db.close()
+        # Add member
+        membership = models.GroupMember(
+            group_id=group.id, user_id=member.id, role=models.GroupRole.MEMBER
+        )
+        db_session.add(membership)
+        db_session.flush()
 
-    def test_update_member_role_success(self):
-        """Test successful member role update."""
-        db = TestingSessionLocal()
-        try:
-            owner = create_test_user(email="owner@example.com")
-            member = create_test_user(
-                email="member@example.com", google_id="member_123"
-            )
-            db.add_all([owner, member])
-            db.commit()
-            db.refresh(owner)
-            db.refresh(member)
-
-            # Create group
-            group_data = schemas.GroupCreate(name="Test Group")
-            group = GroupService.create_group(group_data, owner, db)
-
-            # Add member
-            membership = models.GroupMember(
-                group_id=group.id, user_id=member.id, role=models.GroupRole.MEMBER
-            )
-            db.add(membership)
-            db.commit()
-            db.refresh(membership)
-
-            # Update role
-            role_update = schemas.GroupMemberUpdate(role=models.GroupRole.ADMIN)
-            updated_member = GroupService.update_member_role(
-                group.id, membership.id, role_update, owner, db
-            )
+        # Update role
+        updated_member = GroupService.update_member_role(
+            group.id, membership.id, _ADMIN_ROLE_UPDATE, owner, db_session
+        )
 
-            assert updated_member.role == models.GroupRole.ADMIN
-        finally:
-            db.close()
+        assert updated_member.role == models.GroupRole.ADMIN
 
-    def test_get_group_stats(self):
+    def test_get_group_stats(self, db_session, seeded_owner_and_group, query_count):
         """Test getting group statistics."""
-        db = TestingSessionLocal()
-        try:
-            owner1 = create_test_user(email="owner1@example.com")
-            owner2 = create_test_user(
-                email="owner2@example.com", google_id="owner2_123"
-            )
-            db.add_all([owner1, owner2])
-            db.commit()
-            db.refresh(owner1)
-            db.refresh(owner2)
-
-            # Create groups
-            group1_data = schemas.GroupCreate(name="Group 1")
-            group2_data = schemas.GroupCreate(name="Group 2")
-            group1 = GroupService.create_group(group1_data, owner1, db)
-            GroupService.create_group(group2_data, owner2, db)
-
-            # Create invitation
-            invitation = models.GroupInvitation(
-                group_id=group1.id,
-                invited_email="invitee@example.com",
-                invited_by_id=owner1.id,
-                role=models.GroupRole.MEMBER,
-                expires_at=datetime.datetime.now(datetime.timezone.utc)
-                + datetime.timedelta(days=7),
-            )
-            db.add(invitation)
-            db.commit()
-
-            # Get stats
-            stats = GroupService.get_group_stats(db)
-
-            assert stats.total_groups == 2
-            assert stats.active_groups == 2
-            assert stats.total_members == 2  # Each owner is a member
-            assert stats.pending_invitations == 1
-        finally:
-            db.close()
+        owner1_id, group1_id = seeded_owner_and_group
+        (owner2_id,) = seed_users_bulk(
+            db_session, [{"email": "owner2@example.com", "google_id": "owner2_123"}]
+        )
+        owner2 = db_session.get(models.User, owner2_id)
+
+        # Create second group alongside the seeded one
+        group2_data = schemas.GroupCreate(name="Group 2")
+        GroupService.create_group(group2_data, owner2, db_session)
+
+        # Create invitation
+        invitation = models.GroupInvitation(
+            group_id=group1_id,
+            invited_email="invitee@example.com",
+            invited_by_id=owner1_id,
+            role=models.GroupRole.MEMBER,
+            expires_at=FAR_FUTURE,
+        )
+        db_session.add(invitation)
+        db_session.flush()
+
+        # Get stats in a single statement
+        with query_count() as queries, no_lazy_loads(db_session):
+            stats = GroupService.get_group_stats(db_session)
+
+        assert len(queries) == 1
+
+        assert stats.total_groups == 2
+        assert stats.active_groups == 2
+        assert stats.total_members == 2  # Each owner is a member
+        assert stats.pending_invitations == 1
 
 
 if __name__ == "__main__":
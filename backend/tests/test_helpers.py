@@ -2,10 +2,19 @@
 Test helper functions for creating Google OAuth users and other test utilities.
 """
 
-from typing import Optional
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, raiseload, sessionmaker
 
 from models import SubscriptionStatus, SubscriptionTier, User
 
+# Unbound until conftest's engine fixture configures it with the test engine
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False
+)
+
 
 def create_test_user(
     email: str = "test@example.com",
@@ -42,3 +51,54 @@ def create_test_admin(
         google_id=google_id,
         is_admin=True,
     )
+
+
+def seed_users_bulk(db: Session, rows: List[Dict[str, object]]) -> List[int]:
+    """
+    Insert users from plain column mappings in one batched statement.
+
+    Skips building ORM instances; returns the new IDs in row order. Load a
+    user with ``db.get(User, user_id)`` when a test needs the object.
+    """
+    rows = [dict(row) for row in rows]
+    db.bulk_insert_mappings(User, rows, return_defaults=True)
+    return [row["id"] for row in rows]
+
+
+@contextmanager
+def count_queries(db: Session) -> Iterator[List[str]]:
+    """Collect the SQL statements the session executes inside the block."""
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # SAVEPOINT bookkeeping comes from the db_session fixture, not the app
+        if "SAVEPOINT" not in statement:
+            statements.append(statement)
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+
+
+@contextmanager
+def no_lazy_loads(db: Session) -> Iterator[None]:
+    """Make any relationship lazy load on objects queried in the block raise."""
+
+    def add_raiseload(orm_execute_state):
+        if (
+            orm_execute_state.is_select
+            and not orm_execute_state.is_column_load
+            and not orm_execute_state.is_relationship_load
+        ):
+            orm_execute_state.statement = orm_execute_state.statement.options(
+                raiseload("*")
+            )
+
+    event.listen(db, "do_orm_execute", add_raiseload)
+    try:
+        yield
+    finally:
+        event.remove(db, "do_orm_execute", add_raiseload)
@@ -1,45 +1,52 @@
 import hashlib
 import hmac
 import os
-from unittest.mock import MagicMock, patch
+from dataclasses import dataclass
+from typing import Any, Optional
+from unittest.mock import patch
 
 # Set testing environment variable before importing main
 os.environ["TESTING"] = "1"
 
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import insert
 from test_helpers import create_test_user
 
-from database import Base
 from lemonsqueezy_service import LemonSqueezyService
-from models import Subscription, SubscriptionStatus, SubscriptionTier, User
+from models import Incident, Project, SubscriptionStatus, SubscriptionTier
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# A fixed payload/secret pair, signed once for the signature tests
+WEBHOOK_PAYLOAD = b'{"test": "data"}'
+WEBHOOK_SECRET = "test_secret"
+WEBHOOK_SIGNATURE = hmac.new(
+    WEBHOOK_SECRET.encode(), WEBHOOK_PAYLOAD, hashlib.sha256
+).hexdigest()
 
-Base.metadata.create_all(bind=engine)
+
+@dataclass(frozen=True)
+class FakeResponse:
+    """Stand-in for requests.Response exposing what the service reads"""
+
+    status_code: int
+    payload: Optional[Any] = None
+    text: str = "Error"
+
+    def json(self):
+        return self.payload
+
+
+@pytest.fixture(scope="class", autouse=True)
+def _patched_post():
+    """Keep every test in a class off the network with one requests.post patch"""
+    with patch("lemonsqueezy_service.requests.post") as post:
+        yield post
 
 
 @pytest.fixture
-def db_session():
-    """Create a database session for testing"""
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        # Clean up data after each test
-        db.query(Subscription).delete()
-        db.query(User).delete()
-        db.commit()
-        db.close()
+def mock_post(_patched_post):
+    """The shared requests.post mock, reset for the current test"""
+    _patched_post.reset_mock(return_value=True, side_effect=True)
+    return _patched_post
 
 
 @pytest.fixture
@@ -51,11 +58,27 @@ def test_user(db_session):
         subscription_status=SubscriptionStatus.ACTIVE,
     )
     db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
+    db_session.flush()
     return user
 
 
+@pytest.fixture
+def base_event(test_user):
+    """A fresh active-subscription event for test_user; tests fill in the rest"""
+    return {
+        "meta": {"event_name": ""},
+        "data": {
+            "id": "123",
+            "attributes": {
+                "custom_data": {"user_id": str(test_user.id)},
+                "status": "active",
+            },
+        },
+    }
+
+
+@patch("lemonsqueezy_service.LEMONSQUEEZY_API_KEY", "test_key")
+@patch("lemonsqueezy_service.LEMONSQUEEZY_STORE_ID", "1")
 class TestLemonSqueezyService:
     def test_get_subscription_limits_free(self):
         """Test getting subscription limits for free tier"""
@@ -76,101 +99,86 @@ class TestLemonSqueezyService:
         assert "custom_domain" in limits["features"]
         assert "advanced_analytics" in limits["features"]
 
-    def test_can_create_project_free_tier_no_projects(self, test_user, db_session):
-        """Test that free tier user can create their first project"""
-        result = LemonSqueezyService.can_create_project(test_user, db_session)
-        assert result is True
-
-    def test_can_create_project_free_tier_at_limit(self, test_user, db_session):
-        """Test that free tier user cannot create project when at limit"""
-        from models import Project
-
-        # Create a project to reach the limit
-        project = Project(name="Test Project", owner_id=test_user.id)
-        db_session.add(project)
-        db_session.commit()
-
-        result = LemonSqueezyService.can_create_project(test_user, db_session)
-        assert result is False
-
-    def test_can_create_project_pro_tier(self, test_user, db_session):
-        """Test that pro tier user can create projects under limit"""
-        test_user.subscription_tier = SubscriptionTier.PRO
-        db_session.commit()
-
-        result = LemonSqueezyService.can_create_project(test_user, db_session)
-        assert result is True
-
-    def test_can_create_incident_free_tier_under_limit(self, test_user, db_session):
-        """Test that free tier user can create incident under limit"""
-        from models import Project
-
-        # Create a project
-        project = Project(name="Test Project", owner_id=test_user.id)
-        db_session.add(project)
-        db_session.commit()
-
-        result = LemonSqueezyService.can_create_incident(
-            test_user, project.id, db_session
-        )
-        assert result is True
-
-    def test_can_create_incident_free_tier_at_limit(self, test_user, db_session):
-        """Test that free tier user cannot create incident at limit"""
-        from models import Incident, Project
-
-        # Create a project
-        project = Project(name="Test Project", owner_id=test_user.id)
-        db_session.add(project)
-        db_session.commit()
-
-        # Create incidents up to the limit (5 for free tier)
-        for i in range(5):
-            incident = Incident(
-                title=f"Test Incident {i}",
-                description="Test description",
-                project_id=project.id,
+    @pytest.mark.parametrize(
+        "tier,projects,incidents,can_create_project,can_create_incident",
+        [
+            (SubscriptionTier.FREE, 0, 0, True, None),
+            (SubscriptionTier.FREE, 1, 0, False, True),
+            (SubscriptionTier.FREE, 1, 5, False, False),
+            (SubscriptionTier.PRO, 0, 0, True, None),
+            (SubscriptionTier.PRO, 1, 5, True, True),
+        ],
+        ids=[
+            "free_no_projects",
+            "free_at_project_limit",
+            "free_at_incident_limit",
+            "pro_no_projects",
+            "pro_under_limits",
+        ],
+    )
+    def test_subscription_limits(
+        self,
+        test_user,
+        db_session,
+        tier,
+        projects,
+        incidents,
+        can_create_project,
+        can_create_incident,
+    ):
+        """Test project and incident limits for each tier and usage level"""
+        test_user.subscription_tier = tier
+        db_session.flush()
+
+        # Seed projects, then incidents in the first one, with one executemany each
+        project_ids = []
+        if projects:
+            project_ids = db_session.scalars(
+                insert(Project).returning(Project.id),
+                [
+                    {"name": f"Test Project {i}", "owner_id": test_user.id}
+                    for i in range(projects)
+                ],
+            ).all()
+        if incidents:
+            db_session.execute(
+                insert(Incident),
+                [
+                    {
+                        "title": f"Test Incident {i}",
+                        "description": "Test description",
+                        "project_id": project_ids[0],
+                    }
+                    for i in range(incidents)
+                ],
             )
-            db_session.add(incident)
-        db_session.commit()
 
-        result = LemonSqueezyService.can_create_incident(
-            test_user, project.id, db_session
+        assert (
+            LemonSqueezyService.can_create_project(test_user, db_session)
+            is can_create_project
         )
-        assert result is False
+        if can_create_incident is not None:
+            assert (
+                LemonSqueezyService.can_create_incident(
+                    test_user, project_ids[0], db_session
+                )
+                is can_create_incident
+            )
 
-    @patch("lemonsqueezy_service.requests.post")
-    @patch("lemonsqueezy_service.LEMONSQUEEZY_API_KEY", "test_key")
-    @patch("lemonsqueezy_service.LEMONSQUEEZY_STORE_ID", "1")
-    def test_create_customer_success(self, mock_post):
-        """Test successful customer creation"""
-        mock_response = MagicMock()
-        mock_response.status_code = 201
-        mock_response.json.return_value = {"data": {"id": "123"}}
-        mock_post.return_value = mock_response
+    @pytest.mark.parametrize(
+        "status_code,body,expected",
+        [(201, {"data": {"id": "123"}}, "123"), (400, None, None)],
+        ids=["success", "failure"],
+    )
+    def test_create_customer(self, mock_post, status_code, body, expected):
+        """Test customer creation returns the new ID only on success"""
+        mock_post.return_value = FakeResponse(status_code, body)
 
         result = LemonSqueezyService.create_customer("test@example.com", "Test User")
 
-        assert result == "123"
+        assert result == expected
         mock_post.assert_called_once()
 
-    @patch("lemonsqueezy_service.requests.post")
-    @patch("lemonsqueezy_service.LEMONSQUEEZY_API_KEY", "test_key")
-    @patch("lemonsqueezy_service.LEMONSQUEEZY_STORE_ID", "1")
-    def test_create_customer_failure(self, mock_post):
-        """Test customer creation failure"""
-        mock_response = MagicMock()
-        mock_response.status_code = 400
-        mock_response.text = "Error"
-        mock_post.return_value = mock_response
-
-        result = LemonSqueezyService.create_customer("test@example.com")
-
-        assert result is None
-
-    @patch("lemonsqueezy_service.requests.post")
-    @patch("lemonsqueezy_service.LEMONSQUEEZY_API_KEY", "test_key")
-    @patch("lemonsqueezy_service.LEMONSQUEEZY_STORE_ID", "1")
     def test_create_customer_exception(self, mock_post):
         """Test customer creation with exception"""
         mock_post.side_effect = Exception("Network error")
@@ -179,58 +187,45 @@ class TestLemonSqueezyService:
 
         assert result is None
 
-    @patch("lemonsqueezy_service.requests.post")
-    @patch("lemonsqueezy_service.LEMONSQUEEZY_API_KEY", "test_key")
-    @patch("lemonsqueezy_service.LEMONSQUEEZY_STORE_ID", "1")
-    def test_create_checkout_url_success(self, mock_post):
-        """Test successful checkout URL creation"""
-        mock_response = MagicMock()
-        mock_response.status_code = 201
-        mock_response.json.return_value = {
-            "data": {"attributes": {"url": "https://checkout.lemonsqueezy.com/test"}}
-        }
-        mock_post.return_value = mock_response
-
-        result = LemonSqueezyService.create_checkout_url(
-            "variant_123", "test@example.com", "https://success.com", 1
-        )
-
-        assert result == "https://checkout.lemonsqueezy.com/test"
-
-    @patch("lemonsqueezy_service.requests.post")
-    @patch("lemonsqueezy_service.LEMONSQUEEZY_API_KEY", "test_key")
-    @patch("lemonsqueezy_service.LEMONSQUEEZY_STORE_ID", "1")
-    def test_create_checkout_url_failure(self, mock_post):
-        """Test checkout URL creation failure"""
-        mock_response = MagicMock()
-        mock_response.status_code = 400
-        mock_response.text = "Error"
-        mock_post.return_value = mock_response
+    @pytest.mark.parametrize(
+        "status_code,body,expected",
+        [
+            (
+                201,
+                {
+                    "data": {
+                        "attributes": {"url": "https://checkout.lemonsqueezy.com/test"}
+                    }
+                },
+                "https://checkout.lemonsqueezy.com/test",
+            ),
+            (400, None, None),
+        ],
+        ids=["success", "failure"],
+    )
+    def test_create_checkout_url(self, mock_post, status_code, body, expected):
+        """Test checkout URL creation returns the URL only on success"""
+        mock_post.return_value = FakeResponse(status_code, body)
 
         result = LemonSqueezyService.create_checkout_url(
             "variant_123", "test@example.com", "https://success.com", 1
         )
 
-        assert result is None
+        assert result == expected
 
     def test_verify_webhook_signature_valid(self):
         """Test webhook signature verification with valid signature"""
-        payload = b'{"test": "data"}'
-        secret = "test_secret"
-        signature = hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
-
-        with patch.dict(os.environ, {"LEMONSQUEEZY_WEBHOOK_SECRET": secret}):
-            result = LemonSqueezyService.verify_webhook_signature(payload, signature)
+        with patch.dict(os.environ, {"LEMONSQUEEZY_WEBHOOK_SECRET": WEBHOOK_SECRET}):
+            result = LemonSqueezyService.verify_webhook_signature(
+                WEBHOOK_PAYLOAD, WEBHOOK_SIGNATURE
+            )
             assert result is True
 
     def test_verify_webhook_signature_invalid(self):
         """Test webhook signature verification with invalid signature"""
-        payload = b'{"test": "data"}'
-        secret = "test_secret"
-
-        with patch.dict(os.environ, {"LEMONSQUEEZY_WEBHOOK_SECRET": secret}):
+        with patch.dict(os.environ, {"LEMONSQUEEZY_WEBHOOK_SECRET": WEBHOOK_SECRET}):
             result = LemonSqueezyService.verify_webhook_signature(
-                payload, "invalid_signature"
+                WEBHOOK_PAYLOAD, "invalid_signature"
             )
             assert result is False
 
@@ -247,97 +242,82 @@ class TestLemonSqueezyService:
             assert result is False
 
     @patch.dict(os.environ, {"LEMONSQUEEZY_PRO_VARIANT_ID": "789"})
-    def test_handle_webhook_subscription_created(self, test_user, db_session):
+    def test_handle_webhook_subscription_created(
+        self, test_user, base_event, db_session
+    ):
         """Test handling subscription_created webhook"""
-        event_data = {
-            "meta": {"event_name": "subscription_created"},
-            "data": {
-                "id": "123",
-                "attributes": {
-                    "custom_data": {"user_id": str(test_user.id)},
-                    "customer_id": "456",
-                    "variant_id": "789",
-                    "order_id": "101112",
-                    "status": "active",
-                    "trial_ends_at": "2024-12-31T23:59:59Z",
-                    "billing_anchor": "2024-12-31T23:59:59Z",
-                },
-            },
-        }
+        base_event["meta"]["event_name"] = "subscription_created"
+        base_event["data"]["attributes"].update(
+            {
+                "customer_id": "456",
+                "variant_id": "789",
+                "order_id": "101112",
+                "trial_ends_at": "2024-12-31T23:59:59Z",
+                "billing_anchor": "2024-12-31T23:59:59Z",
+            }
+        )
 
-        result = LemonSqueezyService.handle_webhook(event_data, db_session)
+        result = LemonSqueezyService.handle_webhook(base_event, db_session)
         assert result is True
 
         # Check that user subscription was updated
-        db_session.refresh(test_user)
+        db_session.expire(test_user)
         assert test_user.subscription_tier == SubscriptionTier.PRO
         assert test_user.subscription_status == SubscriptionStatus.ACTIVE
 
-    def test_handle_webhook_subscription_updated(self, test_user, db_session):
+    def test_handle_webhook_subscription_updated(
+        self, test_user, base_event, db_session
+    ):
         """Test handling subscription_updated webhook"""
         # Set user to pro first
         test_user.subscription_tier = SubscriptionTier.PRO
         test_user.subscription_status = SubscriptionStatus.ACTIVE
-        db_session.commit()
-
-        event_data = {
-            "meta": {"event_name": "subscription_updated"},
-            "data": {
-                "id": "123",
-                "attributes": {
-                    "custom_data": {"user_id": str(test_user.id)},
-                    "status": "active",
-                    "trial_ends_at": "2024-12-31T23:59:59Z",
-                    "billing_anchor": "2024-12-31T23:59:59Z",
-                },
-            },
-        }
+        db_session.flush()
+
+        base_event["meta"]["event_name"] = "subscription_updated"
+        base_event["data"]["attributes"].update(
+            {
+                "trial_ends_at": "2024-12-31T23:59:59Z",
+                "billing_anchor": "2024-12-31T23:59:59Z",
+            }
+        )
 
-        result = LemonSqueezyService.handle_webhook(event_data, db_session)
+        result = LemonSqueezyService.handle_webhook(base_event, db_session)
         assert result is True
 
-    def test_handle_webhook_subscription_cancelled(self, test_user, db_session):
+    def test_handle_webhook_subscription_cancelled(
+        self, test_user, base_event, db_session
+    ):
         """Test handling subscription_cancelled webhook"""
         test_user.subscription_tier = SubscriptionTier.PRO
         test_user.subscription_status = SubscriptionStatus.ACTIVE
-        db_session.commit()
+        db_session.flush()
 
-        event_data = {
-            "meta": {"event_name": "subscription_cancelled"},
-            "data": {
-                "id": "123",
-                "attributes": {
-                    "custom_data": {"user_id": str(test_user.id)},
-                    "status": "canceled",
-                    "ends_at": "2024-12-31T23:59:59Z",
-                },
-            },
-        }
+        base_event["meta"]["event_name"] = "subscription_cancelled"
+        base_event["data"]["attributes"].update(
+            {"status": "canceled", "ends_at": "2024-12-31T23:59:59Z"}
+        )
 
-        result = LemonSqueezyService.handle_webhook(event_data, db_session)
+        result = LemonSqueezyService.handle_webhook(base_event, db_session)
         assert result is True
 
-        db_session.refresh(test_user)
+        db_session.expire(test_user)
         assert test_user.subscription_status == SubscriptionStatus.CANCELED
 
-    def test_handle_webhook_subscription_expired(self, test_user, db_session):
+    def test_handle_webhook_subscription_expired(
+        self, test_user, base_event, db_session
+    ):
         """Test handling subscription_expired webhook"""
         test_user.subscription_tier = SubscriptionTier.PRO
         test_user.subscription_status = SubscriptionStatus.CANCELED
-        db_session.commit()
+        db_session.flush()
 
-        event_data = {
-            "meta": {"event_name": "subscription_expired"},
-            "data": {
-                "id": "123",
-                "attributes": {"custom_data": {"user_id": str(test_user.id)}},
-            },
-        }
+        base_event["meta"]["event_name"] = "subscription_expired"
 
-        result = LemonSqueezyService.handle_webhook(event_data, db_session)
+        result = LemonSqueezyService.handle_webhook(base_event, db_session)
         assert result is True
 
-        db_session.refresh(test_user)
+        db_session.expire(test_user)
         assert test_user.subscription_tier == SubscriptionTier.FREE
         assert test_user.subscription_status == SubscriptionStatus.EXPIRED
 
@@ -367,35 +347,30 @@ class TestLemonSqueezyService:
         result = LemonSqueezyService.handle_webhook(event_data, db_session)
         assert result is False
 
-    def test_handle_webhook_find_user_by_email(self, test_user, db_session):
+    def test_handle_webhook_find_user_by_email(self, test_user, base_event, db_session):
         """Test handling webhook that finds user by email"""
-        event_data = {
-            "meta": {"event_name": "subscription_created"},
-            "data": {
-                "id": "123",
-                "attributes": {
-                    "user_email": test_user.email,
-                    "customer_id": "456",
-                    "variant_id": "789",
-                    "order_id": "101112",
-                    "status": "active",
-                    "trial_ends_at": "2024-12-31T23:59:59Z",
-                    "billing_anchor": "2024-12-31T23:59:59Z",
-                },
-            },
-        }
+        base_event["meta"]["event_name"] = "subscription_created"
+        attributes = base_event["data"]["attributes"]
+        del attributes["custom_data"]
+        attributes.update(
+            {
+                "user_email": test_user.email,
+                "customer_id": "456",
+                "variant_id": "789",
+                "order_id": "101112",
+                "trial_ends_at": "2024-12-31T23:59:59Z",
+                "billing_anchor": "2024-12-31T23:59:59Z",
+            }
+        )
 
-        result = LemonSqueezyService.handle_webhook(event_data, db_session)
+        result = LemonSqueezyService.handle_webhook(base_event, db_session)
         assert result is True
 
-    def test_handle_webhook_unknown_event(self, test_user, db_session):
+    def test_handle_webhook_unknown_event(self, base_event, db_session):
         """Test handling webhook with unknown event type"""
-        event_data = {
-            "meta": {"event_name": "unknown_event"},
-            "data": {"attributes": {"custom_data": {"user_id": str(test_user.id)}}},
-        }
+        base_event["meta"]["event_name"] = "unknown_event"
 
-        result = LemonSqueezyService.handle_webhook(event_data, db_session)
+        result = LemonSqueezyService.handle_webhook(base_event, db_session)
         assert result is True  # Should return True for unknown but valid events
 
     def test_handle_webhook_exception(self, db_session):
@@ -6,99 +6,113 @@ os.environ["TESTING"] = "1"
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from test_helpers import create_test_user
+from sqlalchemy import delete, insert
+from test_helpers import TestingSessionLocal, create_test_user
 
-from database import Base, override_engine
+import auth
+from auth import create_access_token
 from main import app, get_db
 from models import Incident, Project, SubscriptionStatus, SubscriptionTier, User
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-override_engine(engine)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Use a fixed datetime instead of relative to avoid timezone issues; the API
+# strips timezone info, so responses compare against the naive form
+SCHEDULED_START = datetime.datetime(2024, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc)
+SCHEDULED_START_NAIVE = SCHEDULED_START.replace(tzinfo=None)
 
-# Create tables once at module level
-Base.metadata.create_all(bind=engine)
 
+@pytest.fixture(scope="module")
+def client():
+    """Share one started TestClient across every test in this module"""
+    with TestClient(app) as client:
+        yield client
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
 
+@pytest.fixture(autouse=True)
+def override_db(db_session, monkeypatch):
+    """Serve every request from the test's rolled-back db_session"""
+
+    def override_get_db():
+        yield db_session
+
+    # auth resolves the current user through its own get_db
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.setitem(app.dependency_overrides, auth.get_db, override_get_db)
+
+
+@pytest.fixture(scope="module")
+def test_user(tables):
+    """
+    Commit the module's user once and yield it detached.
+
+    Tests only read its id and email; the row is deleted once the module
+    finishes, after every test's own rows have been rolled back.
+    """
+    with TestingSessionLocal() as db:
+        user = create_test_user(
+            email="test@example.com",
+            name="Test User",
+            google_id="test_google_123",
+            subscription_tier=SubscriptionTier.FREE,
+            subscription_status=SubscriptionStatus.ACTIVE,
+        )
+        db.add(user)
+        db.commit()
 
-app.dependency_overrides[get_db] = override_get_db
+    yield user
 
-client = TestClient(app)
+    with TestingSessionLocal() as db:
+        db.execute(delete(User).where(User.id == user.id))
+        db.commit()
 
 
-@pytest.fixture(scope="session", autouse=True)
-def setup_database():
-    """Create tables once for the entire test session"""
-    Base.metadata.create_all(bind=engine)
-    yield
-    Base.metadata.drop_all(bind=engine)
+@pytest.fixture(scope="module")
+def auth_headers(test_user):
+    # Since we're using Google OAuth now, we need to create a JWT token directly
+    token = create_access_token({"sub": test_user.email})
+    return {"Authorization": f"Bearer {token}"}
 
 
-@pytest.fixture(autouse=True)
-def clean_database():
-    """Clean all data before each test"""
-    db = TestingSessionLocal()
-    try:
-        # Delete all data in reverse dependency order
-        db.query(Incident).delete()
-        db.query(Project).delete()
-        db.query(User).delete()
+def _committed_project(test_user, **fields):
+    with TestingSessionLocal() as db:
+        project = Project(owner_id=test_user.id, **fields)
+        db.add(project)
         db.commit()
-    finally:
-        db.close()
-    yield
 
+    yield project
 
-@pytest.fixture
-def test_user():
-    db = TestingSessionLocal()
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == "test@example.com").first()
-    if existing_user:
-        db.close()
-        return existing_user
-
-    user = create_test_user(
-        email="test@example.com",
-        name="Test User",
-        google_id="test_google_123",
-        subscription_tier=SubscriptionTier.FREE,
-        subscription_status=SubscriptionStatus.ACTIVE,
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    db.close()
-    return user
+    with TestingSessionLocal() as db:
+        db.execute(delete(Project).where(Project.id == project.id))
+        db.commit()
 
 
-@pytest.fixture
-def auth_headers(test_user):
-    # Since we're using Google OAuth now, we need to create a JWT token directly
-    from auth import create_access_token
+@pytest.fixture(scope="class")
+def project(test_user):
+    """Commit one project per test class; tests add their incidents per test"""
+    yield from _committed_project(test_user, name="Test Project")
 
-    token = create_access_token({"sub": test_user.email})
-    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture(scope="class")
+def public_project(test_user):
+    yield from _committed_project(test_user, name="Public Project", is_public=True)
+
+
+def _insert_incident(db, project_id, title, description):
+    return db.execute(
+        insert(Incident)
+        .values(project_id=project_id, title=title, description=description)
+        .returning(Incident.id)
+    ).scalar_one()
+
+
+@pytest.fixture
+def incident_id(db_session, project):
+    return _insert_incident(
+        db_session, project.id, "Test Incident", "This is a test incident"
+    )
 
 
 class TestConfiguration:
-    def test_config_endpoint(self):
+    def test_config_endpoint(self, client):
         """Test the configuration endpoint returns proper feature toggles"""
         response = client.get("/config")
         assert response.status_code == 200
@@ -108,14 +122,14 @@ class TestConfiguration:
 
 
 class TestHealthEndpoints:
-    def test_root_endpoint(self):
+    def test_root_endpoint(self, client):
         """Test the root endpoint"""
         response = client.get("/")
         assert response.status_code == 200
         data = response.json()
         assert "message" in data
 
-    def test_health_endpoint(self):
+    def test_health_endpoint(self, client):
         """Test the health check endpoint"""
         response = client.get("/health")
         assert response.status_code == 200
@@ -124,7 +138,7 @@ class TestHealthEndpoints:
 
 
 class TestProjects:
-    def test_create_project_success(self, test_user, auth_headers):
+    def test_create_project_success(self, client, test_user, auth_headers):
         response = client.post(
             "/projects/", json={"name": "Test Project"}, headers=auth_headers
         )
@@ -133,39 +147,24 @@ class TestProjects:
         assert data["name"] == "Test Project"
         assert "id" in data
 
-    def test_create_project_unauthorized(self):
+    def test_create_project_unauthorized(self, client):
         response = client.post("/projects/", json={"name": "Test Project"})
         assert response.status_code == 401
 
-    def test_list_projects_success(self, test_user, auth_headers):
-        # Create a project first
-        db = TestingSessionLocal()
-        project = Project(name="Test Project", owner_id=test_user.id)
-        db.add(project)
-        db.commit()
-        db.close()
-
+    def test_list_projects_success(self, client, project, auth_headers):
         response = client.get("/projects/", headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
         assert data[0]["name"] == "Test Project"
 
-    def test_list_projects_unauthorized(self):
+    def test_list_projects_unauthorized(self, client):
         response = client.get("/projects/")
         assert response.status_code == 401
 
 
 class TestIncidents:
-    def test_create_incident_success(self, test_user, auth_headers):
-        # Create a project first
-        db = TestingSessionLocal()
-        project = Project(name="Test Project", owner_id=test_user.id)
-        db.add(project)
-        db.commit()
-        db.refresh(project)
-        db.close()
-
+    def test_create_incident_success(self, client, project, auth_headers):
         response = client.post(
             "/incidents/",
             json={
@@ -182,28 +181,14 @@ class TestIncidents:
         assert data["project_id"] == project.id
         assert data["resolved"] is False
 
-    def test_create_scheduled_incident(self, test_user, auth_headers):
-        # Create a project first
-        db = TestingSessionLocal()
-        project = Project(name="Test Project", owner_id=test_user.id)
-        db.add(project)
-        db.commit()
-        db.refresh(project)
-        db.close()
-
-        # Use a fixed datetime instead of relative to avoid timezone issues
-        scheduled_start = datetime.datetime(
-            2024, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc
-        )
-        scheduled_start_iso = scheduled_start.isoformat()
-
+    def test_create_scheduled_incident(self, client, project, auth_headers):
         response = client.post(
             "/incidents/",
             json={
                 "project_id": project.id,
                 "title": "Scheduled Incident",
                 "description": "This is a scheduled incident",
-                "scheduled_start": scheduled_start_iso,
+                "scheduled_start": SCHEDULED_START.isoformat(),
             },
             headers=auth_headers,
         )
@@ -211,12 +196,10 @@ class TestIncidents:
         data = response.json()
         assert data["title"] == "Scheduled Incident"
 
-        # The API strips timezone info, so compare the datetime part only
-        expected_datetime = scheduled_start.replace(tzinfo=None)
         actual_datetime = datetime.datetime.fromisoformat(data["scheduled_start"])
-        assert actual_datetime == expected_datetime
+        assert actual_datetime == SCHEDULED_START_NAIVE
 
-    def test_create_incident_unauthorized(self):
+    def test_create_incident_unauthorized(self, client):
         response = client.post(
             "/incidents/",
             json={
@@ -227,101 +210,51 @@ class TestIncidents:
         )
         assert response.status_code == 401
 
-    def test_list_incidents_success(self, test_user, auth_headers):
-        # Create a project and incident
-        db = TestingSessionLocal()
-        project = Project(name="Test Project", owner_id=test_user.id)
-        db.add(project)
-        db.commit()
-        db.refresh(project)
-        project_id = project.id  # Store the ID before closing session
-
-        incident = Incident(
-            project_id=project.id,
-            title="Test Incident",
-            description="This is a test incident",
-        )
-        db.add(incident)
-        db.commit()
-        db.close()
-
-        response = client.get(f"/projects/{project_id}/incidents", headers=auth_headers)
+    def test_list_incidents_success(self, client, project, incident_id, auth_headers):
+        response = client.get(f"/projects/{project.id}/incidents", headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
         assert data[0]["title"] == "Test Incident"
 
-    def test_resolve_incident_success(self, test_user, auth_headers):
-        # Create a project and incident
-        db = TestingSessionLocal()
-        project = Project(name="Test Project", owner_id=test_user.id)
-        db.add(project)
-        db.commit()
-        db.refresh(project)
-
-        incident = Incident(
-            project_id=project.id,
-            title="Test Incident",
-            description="This is a test incident",
-        )
-        db.add(incident)
-        db.commit()
-        db.refresh(incident)
-        db.close()
-
+    def test_resolve_incident_success(self, client, incident_id, auth_headers):
         response = client.post(
-            f"/incidents/{incident.id}/resolve", headers=auth_headers
+            f"/incidents/{incident_id}/resolve", headers=auth_headers
         )
         assert response.status_code == 200
         data = response.json()
         assert data["resolved"] is True
 
-    def test_resolve_nonexistent_incident(self, test_user, auth_headers):
+    def test_resolve_nonexistent_incident(self, client, test_user, auth_headers):
         response = client.post("/incidents/999/resolve", headers=auth_headers)
         assert response.status_code == 404
 
 
 class TestPublicAPI:
-    def test_public_incidents_success(self, test_user):
-        # Create a public project and incident
-        db = TestingSessionLocal()
-        project = Project(name="Test Project", owner_id=test_user.id, is_public=True)
-        db.add(project)
-        db.commit()
-        db.refresh(project)
-        project_id = project.id  # Store the ID before closing session
-
-        incident = Incident(
-            project_id=project.id,
-            title="Public Incident",
-            description="This is a public incident",
+    def test_public_incidents_success(self, client, db_session, public_project):
+        _insert_incident(
+            db_session,
+            public_project.id,
+            "Public Incident",
+            "This is a public incident",
         )
-        db.add(incident)
-        db.commit()
-        db.close()
 
-        response = client.get(f"/public/{project_id}")
+        response = client.get(f"/public/{public_project.id}")
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
         assert data[0]["title"] == "Public Incident"
 
-    def test_public_incidents_empty_project(self, test_user):
-        # Create a public project with no incidents
-        db = TestingSessionLocal()
-        project = Project(name="Empty Project", owner_id=test_user.id, is_public=True)
-        db.add(project)
-        db.commit()
-        db.refresh(project)
-        project_id = project.id  # Store the ID before closing session
-        db.close()
+    def test_public_incidents_empty_project(self, client, public_project):
+        # The public project has no incidents
+        project_id = public_project.id
 
         response = client.get(f"/public/{project_id}")
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 0
 
-    def test_public_incidents_nonexistent_project(self):
+    def test_public_incidents_nonexistent_project(self, client):
         # Test with a project ID that doesn't exist
         response = client.get("/public/999")
         assert response.status_code == 404
@@ -330,48 +263,18 @@ class TestPublicAPI:
 
 
 class TestValidation:
-    def test_project_name_validation(self, test_user, auth_headers):
-        # Test empty project name
-        response = client.post("/projects/", json={"name": ""}, headers=auth_headers)
+    @pytest.mark.parametrize("name", ["", "a" * 201], ids=["empty", "too_long"])
+    def test_project_name_validation(self, client, auth_headers, name):
+        response = client.post("/projects/", json={"name": name}, headers=auth_headers)
         assert response.status_code == 422
 
-        # Test very long project name
-        long_name = "a" * 201
-        response = client.post(
-            "/projects/", json={"name": long_name}, headers=auth_headers
-        )
-        assert response.status_code == 422
-
-    def test_incident_validation(self, test_user, auth_headers):
-        # Create a project first
-        db = TestingSessionLocal()
-        project = Project(name="Test Project", owner_id=test_user.id)
-        db.add(project)
-        db.commit()
-        db.refresh(project)
-        db.close()
-
-        # Test empty title
-        response = client.post(
-            "/incidents/",
-            json={
-                "project_id": project.id,
-                "title": "",
-                "description": "Valid description",
-            },
-            headers=auth_headers,
-        )
-        assert response.status_code == 422
-
-        # Test very long title
-        long_title = "a" * 201
+    # The schema rejects the title before the project is looked up, so no
+    # project needs to exist
+    @pytest.mark.parametrize("title", ["", "a" * 201], ids=["empty", "too_long"])
+    def test_incident_validation(self, client, auth_headers, title):
         response = client.post(
             "/incidents/",
-            json={
-                "project_id": project.id,
-                "title": long_title,
-                "description": "Valid description",
-            },
+            json={"project_id": 1, "title": title, "description": "Valid description"},
             headers=auth_headers,
         )
         assert response.status_code == 422
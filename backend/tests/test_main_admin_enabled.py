@@ -66,7 +66,7 @@ def clean_database():
 
 @pytest.fixture
 def admin_user():
-    db = TestingSessionLocal()
+    db = TestingSessionLocal(expire_on_commit=False)
     user = create_test_user(
         email="admin@example.com",
         name="Admin User",
@@ -77,7 +77,6 @@ def admin_user():
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
     db.close()
     return user
 
@@ -20,6 +20,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from test_helpers import create_test_user
 
+from auth import create_access_token
 from database import Base, override_engine
 from main import app, get_db
 from models import Incident, Project, SubscriptionStatus, SubscriptionTier, User
@@ -75,7 +76,7 @@ def clean_database():
 
 @pytest.fixture
 def test_user():
-    db = TestingSessionLocal()
+    db = TestingSessionLocal(expire_on_commit=False)
     user = create_test_user(
         email="test@example.com",
         name="Test User",
@@ -85,14 +86,13 @@ def test_user():
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
     db.close()
     return user
 
 
 @pytest.fixture
 def other_user():
-    db = TestingSessionLocal()
+    db = TestingSessionLocal(expire_on_commit=False)
     user = create_test_user(
         email="other@example.com",
         name="Other User",
@@ -102,23 +102,18 @@ def other_user():
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
     db.close()
     return user
 
 
 @pytest.fixture
 def auth_headers(test_user):
-    from auth import create_access_token
-
     token = create_access_token({"sub": test_user.email})
     return {"Authorization": f"Bearer {token}"}
 
 
 @pytest.fixture
 def other_auth_headers(other_user):
-    from auth import create_access_token
-
     token = create_access_token({"sub": other_user.email})
     return {"Authorization": f"Bearer {token}"}
 